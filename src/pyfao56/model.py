@@ -36,6 +36,7 @@ The model.py module contains the following:
 """
 
 import pandas as pd
+import numpy as np
 import datetime
 import math
 
@@ -151,7 +152,7 @@ class Model:
         Save pyfao56 output data to a file
     savesums(filepath='pyfao56.sum')
         Save seasonal water balance data to a file
-    run()
+    run(outputs=None)
         Conduct the FAO-56 calculations from startDate to endDate
     """
 
@@ -251,6 +252,21 @@ class Model:
                 'fDb':'{:7.3f}'.format,'Irrig':'{:7.3f}'.format,
                 'IrrLoss':'{:7.3f}'.format,'Rain':'{:7.3f}'.format,
                 'Runoff':'{:7.3f}'.format}
+        fmthead = {'Year':'  {:>4s}','DOY':'  {:>3s}','DOW':'  {:>3s}',
+                   'Date':'  {:>8s}','ETref':' {:>6s}','tKcb':' {:>5s}',
+                   'Kcb':' {:>5s}','h':' {:>5s}','Kcmax':' {:>5s}',
+                   'fc':' {:>5s}','fw':' {:>5s}','few':' {:>5s}',
+                   'De':' {:>7s}','Kr':' {:>5s}','Ke':' {:>5s}',
+                   'E':' {:>6s}','DPe':' {:>7s}','Kc':' {:>5s}',
+                   'ETc':' {:>6s}','TAW':' {:>7s}','TAWrmax':' {:>7s}',
+                   'TAWb':' {:>7s}','Zr':' {:>5s}','p':' {:>5s}',
+                   'RAW':' {:>7s}','Ks':' {:>5s}','Kcadj':' {:>5s}',
+                   'ETcadj':' {:>6s}','T':' {:>6s}','DP':' {:>7s}',
+                   'Dinc':' {:>7s}','Dr':' {:>7s}','fDr':' {:>7s}',
+                   'Drmax':' {:>7s}','fDrmax':' {:>7s}','Db':' {:>7s}',
+                   'fDb':' {:>7s}','Irrig':' {:>7s}',
+                   'IrrLoss':' {:>7s}','Rain':' {:>7s}',
+                   'Runoff':' {:>7s}'}
         ast='*'*72
         s = ('{:s}\n'
              'pyfao56: FAO-56 Evapotranspiration in Python\n'
@@ -262,13 +278,7 @@ class Model:
              '{:s}\n'
              '{:s}\n'
              '{:s}\n'
-             'Year-DOY  Year  DOY  DOW      Date  ETref  tKcb   Kcb'
-             '     h Kcmax    fc    fw   few      De    Kr    Ke      E'
-             '     DPe    Kc    ETc     TAW TAWrmax    TAWb    Zr     p'
-             '     RAW    Ks Kcadj ETcadj      T      DP    Dinc'
-             '      Dr     fDr   Drmax  fDrmax      Db     fDb'
-             '   Irrig IrrLoss    Rain  Runoff  Year  DOY  DOW'
-             '      Date\n'
+             'Year-DOY'
              ).format(ast,
                       timestamp,
                       sdate,
@@ -277,6 +287,9 @@ class Model:
                       ast,
                       self.comment,
                       ast)
+        for cname in self.odata.columns:
+            s += fmthead[cname].format(cname)
+        s += '\n'
         if not self.odata.empty:
             s += self.odata.to_string(header=False,formatters=fmts)
         return s
@@ -352,12 +365,54 @@ class Model:
     class ModelState:
         """Contain parameters and states for a single timestep."""
 
-        pass
+        __slots__ = ('i','Kcbini','Kcbmid','Kcbend','Lini','Ldev',
+                     'Lmid','Lend','hini','hmax','thetaFC','thetaWP',
+                     'theta0','Zrini','Zrmax','pbase','Ze','REW','CN2',
+                     'solmthd','TEW','De','Dr','Drmax','TAWpm','TAW',
+                     'TAWrmax','Db','TAWb','lyr_dpths','lyr_thFC',
+                     'lyr_thWP','lyr_th0','lyr_mm','lyr_cTAW','fDr',
+                     'Ks','h','Zr','fw','wndht','u2fac','rfcrp','roff',
+                     'cons_p','aq_Ks','tKcbs','ramps','ETref','rain',
+                     'clim','idep','ieff','updKcb','updh','updfc',
+                     'tKcb','Kcb','Kcmax','fc','few','Kr','Ke',
+                     'E','DPe','Kc','ETc','p','RAW','Kcadj','ETcadj',
+                     'T','DP','Dinc','fDrmax','fDb','irrloss','runoff',
+                     'TAWb_prev','CN1','CN3','S1','S3','DeCN3',
+                     'DeCN1','DeCNrng','sf','sfexp')
+
+    def run(self, outputs=None):
+        """Initialize model, conduct simulations, update self.odata
 
-    def run(self):
-        """Initialize model, conduct simulations, update self.odata"""
+        Parameters
+        ----------
+        outputs : str or list, optional
+            Column name(s) from self.cnames to retain in self.odata,
+            each included once in the order given. If None, all
+            columns are retained in the order of self.cnames, with
+            the date columns at both ends. Only the retained columns
+            are constructed in self.odata, which reduces its memory use
+            for large batches of simulations. Daily values for all
+            columns are still computed during the run, and
+            self.swbdata is unaffected. (default = None)
+
+        Raises
+        ------
+        ValueError
+            If outputs is empty or contains names not in self.cnames.
+        """
+
+        #Check requested output columns before simulating
+        if outputs is not None:
+            if isinstance(outputs, str):
+                outputs = [outputs]
+            outputs = list(outputs)
+            if len(outputs) == 0:
+                raise ValueError('No output columns are requested.')
+            unknown = [o for o in outputs if o not in self.cnames]
+            if unknown:
+                raise ValueError('Unknown output columns: '
+                                 + ', '.join(map(str, unknown)))
 
-        tcurrent = self.startDate
         tdelta = datetime.timedelta(days=1)
 
         #Initialize model state
@@ -386,58 +441,53 @@ class Model:
             #Total evaporable water (TEW, mm) - FAO-56 Eq. 73
             io.TEW = 1000. * (io.thetaFC - 0.50 * io.thetaWP) * io.Ze
             #Initial depth of evaporation (De, mm) - FAO-56 page 153
-            io.De = 1000. * (io.thetaFC - 0.50 * io.thetaWP) * io.Ze
+            io.De = io.TEW
             #Initial root zone depletion (Dr, mm) - FAO-56 Eq. 87
             io.Dr = 1000. * (io.thetaFC - io.theta0) * io.Zrini
             #Initial soil depletion for max root depth (Drmax, mm)
             io.Drmax = 1000. * (io.thetaFC - io.theta0) * io.Zrmax
+            #Total available water per meter of soil (mm/m)
+            io.TAWpm = 1000. * (io.thetaFC - io.thetaWP)
             #Initial root zone total available water (TAW, mm)
-            io.TAW = 1000. * (io.thetaFC - io.thetaWP) * io.Zrini
+            io.TAW = io.TAWpm * io.Zrini
             #By default, FAO-56 doesn't consider the following variables
             io.TAWrmax = -99.999
             io.Db = -99.999
             io.TAWb = -99.999
         else:
             io.solmthd = 'L' #Layered soil profile from SoilProfile
-            io.lyr_dpths = list(self.sol.sdata.index)
-            io.lyr_thFC  = list(self.sol.sdata['thetaFC'])
-            io.lyr_thWP  = list(self.sol.sdata['thetaWP'])
-            io.lyr_th0   = list(self.sol.sdata['theta0'])
-            io.TEW = 0.
-            io.De = 0.
-            io.Dr = 0.
-            io.Drmax = 0.
-            io.TAW = 0.
-            io.TAWrmax = 0.
-            #Iterate down the soil profile in 1 mm increments
-            for dpthmm in list(range(1, (io.lyr_dpths[-1] * 10 + 1))):
-                #Find soil layer index that contains dpthmm
-                lyr_idx = [idx for (idx, dpth) in
-                          enumerate(io.lyr_dpths) if dpthmm<=dpth*10][0]
-                #Total evaporable water (TEW, mm) - FAO-56 Eq. 73
-                if dpthmm <= io.Ze * 1000.: #mm
-                    diff=io.lyr_thFC[lyr_idx]-0.50*io.lyr_thWP[lyr_idx]
-                    io.TEW += diff #mm
-                #Initial depth of evaporation (De, mm) - FAO-56 page 153
-                if dpthmm <= io.Ze * 1000.: #mm
-                    diff=io.lyr_thFC[lyr_idx]-0.50*io.lyr_thWP[lyr_idx]
-                    io.De += diff #mm
-                #Initial root zone depletion (Dr, mm)
-                if dpthmm <= io.Zrini * 1000.: #mm
-                    diff = (io.lyr_thFC[lyr_idx] - io.lyr_th0[lyr_idx])
-                    io.Dr += diff #mm
-                #Initial depletion for max root depth (Drmax, mm)
-                if dpthmm <= io.Zrmax * 1000.: #mm
-                    diff = (io.lyr_thFC[lyr_idx] - io.lyr_th0[lyr_idx])
-                    io.Drmax += diff #mm
-                #Initial root zone total available water (TAW, mm)
-                if dpthmm <= io.Zrini * 1000.: #mm
-                    diff = (io.lyr_thFC[lyr_idx] - io.lyr_thWP[lyr_idx])
-                    io.TAW += diff #mm
-                #Total available water for max root depth (TAWrmax, mm)
-                if dpthmm <= io.Zrmax * 1000.: #mm
-                    diff = (io.lyr_thFC[lyr_idx] - io.lyr_thWP[lyr_idx])
-                    io.TAWrmax += diff #mm
+            sdata = self.sol.sdata
+            io.lyr_dpths = sdata.index.to_numpy(dtype=int)
+            io.lyr_thFC  = sdata['thetaFC'].to_numpy(dtype=float)
+            io.lyr_thWP  = sdata['thetaWP'].to_numpy(dtype=float)
+            io.lyr_th0   = sdata['theta0'].to_numpy(dtype=float)
+            #Soil water properties in 1 mm increments down the profile
+            io.lyr_mm = int(io.lyr_dpths[-1]) * 10
+            dpthmm = np.arange(1, io.lyr_mm + 1)
+            #Find soil layer index that contains each dpthmm
+            lyr_idx = np.searchsorted(io.lyr_dpths * 10, dpthmm)
+            thFC = io.lyr_thFC[lyr_idx]
+            thWP = io.lyr_thWP[lyr_idx]
+            th0 = io.lyr_th0[lyr_idx]
+            #Cumulative sums from the surface, indexed by depth (mm)
+            cTEW = [0.] + np.cumsum(thFC - 0.50 * thWP).tolist()
+            cDr = [0.] + np.cumsum(thFC - th0).tolist()
+            io.lyr_cTAW = [0.] + np.cumsum(thFC - thWP).tolist()
+            mmZe = min(io.lyr_mm, math.floor(io.Ze * 1000.))
+            mmZrini = min(io.lyr_mm, math.floor(io.Zrini * 1000.))
+            mmZrmax = min(io.lyr_mm, math.floor(io.Zrmax * 1000.))
+            #Total evaporable water (TEW, mm) - FAO-56 Eq. 73
+            io.TEW = cTEW[mmZe]
+            #Initial depth of evaporation (De, mm) - FAO-56 page 153
+            io.De = io.TEW
+            #Initial root zone depletion (Dr, mm)
+            io.Dr = cDr[mmZrini]
+            #Initial depletion for max root depth (Drmax, mm)
+            io.Drmax = cDr[mmZrmax]
+            #Initial root zone total available water (TAW, mm)
+            io.TAW = io.lyr_cTAW[mmZrini]
+            #Total available water for max root depth (TAWrmax, mm)
+            io.TAWrmax = io.lyr_cTAW[mmZrmax]
             #Initial depletion in the bottom layer (Db, mm)
             io.Db = io.Drmax - io.Dr
             #Initial total available water in bottom layer (TAWb, mm)
@@ -449,73 +499,199 @@ class Model:
         io.Zr = io.Zrini
         io.fw = 1.0
         io.wndht  = self.wth.wndht
+        #Wind speed adjustment to 2 m height - FAO-56 Eq. 47
+        io.u2fac  = 4.87/math.log(67.8*io.wndht-5.42)
         io.rfcrp  = self.wth.rfcrp
         io.roff   = self.roff
+        if io.roff is True:
+            #Curve numbers for dry and wet antecedent conditions
+            #ASCE (2016) Eqs. 14-14 and 14-15
+            io.CN1 = io.CN2/(2.281-0.01281*io.CN2)
+            io.CN3 = io.CN2/(0.427+0.00573*io.CN2)
+            #Potential maximum retention (mm) - ASCE (2016) Eq. 14-12
+            io.S1 = 250.*((100./io.CN1)-1.)
+            io.S3 = 250.*((100./io.CN3)-1.)
+            #Depths of evaporation (mm) bounding the CN interpolation
+            io.DeCN3 = 0.5*io.REW #ASCE (2016) Eq. 14-18
+            io.DeCN1 = 0.7*io.REW+0.3*io.TEW #ASCE (2016) Eq. 14-19
+            io.DeCNrng = 0.2*io.REW+0.3*io.TEW #ASCE (2016) Eq. 14-20
         io.cons_p = self.cons_p
         io.aq_Ks  = self.aq_Ks
-        self.odata = pd.DataFrame(columns=self.cnames)
-
-        while tcurrent <= self.endDate:
-            mykey = tcurrent.strftime('%Y-%j')
+        if io.aq_Ks is True:
+            #Shape factor for the AquaCrop Ks curve
+            io.sf = 1.5
+            io.sfexp = math.exp(io.sf)-1.0
+
+        #Format date strings for all days
+        dates = pd.date_range(self.startDate, self.endDate)
+        ndays = len(dates)
+        keys = dates.strftime('%Y-%j').tolist()
+        years = dates.strftime('%Y').tolist()
+        doys = dates.strftime('%j').tolist() #Day of Year
+        dows = dates.strftime('%a').tolist() #Day of Week
+        dats = dates.strftime('%m/%d/%y').tolist() #Date mm/dd/yy
+
+        #Preallocate daily output for the numeric columns of self.cnames
+        ocols = self.cnames[4:-4]
+        obuf = np.empty((ndays, len(ocols)))
+
+        #Trapezoidal Kcb (tKcb) for all days - FAO-56 Tables 11 and 17
+        s1 = io.Lini
+        s2 = s1 + io.Ldev
+        s3 = s2 + io.Lmid
+        s4 = s3 + io.Lend
+        day = np.arange(ndays)
+        dev = (day>s1) & (day<=s2)
+        late = (day>s3) & (day<=s4)
+        tKcb = np.full(ndays, float(io.Kcbend))
+        tKcb[day<=s4] = io.Kcbmid
+        tKcb[late] = (io.Kcbmid+(io.Kcbend-io.Kcbmid)*
+                      (day[late]-s3)/(s4-s3))
+        tKcb[day<=s2] = io.Kcbini
+        tKcb[dev] = (io.Kcbini+(io.Kcbmid-io.Kcbini)*
+                     (day[dev]-s1)/(s2-s1))
+        io.tKcbs = tKcb.tolist()
+        #Kcb follows the tKcb ramps from any previously updated value
+        io.ramps = (dev | late).tolist()
+
+        #Obtain updates for Kcb, h, and fc for all days, if available
+        if self.upd is not None:
+            updKcb = self.upd.getseries(keys,'Kcb')
+            updh = self.upd.getseries(keys,'h')
+            updfc = self.upd.getseries(keys,'fc')
+        else:
+            updKcb = updh = updfc = [float('NaN')] * ndays
+
+        #Obtain irrigation data for all days, if available
+        if self.irr is not None:
+            idf = self.irr.idata.reindex(keys)
+            irrday = idf.index.isin(self.irr.idata.index).tolist()
+            irrDepth = idf['Depth'].tolist()
+            irrfw = idf['fw'].tolist()
+            irrieff = idf['ieff'].tolist()
+
+        #Obtain weather data for all days as lists of floats
+        wdf = self.wth.wdata.loc[keys]
+        wETref = wdf['ETref'].tolist()
+        wRain  = wdf['Rain'].tolist()
+        #Default wind speed is 2.0 m/s where missing
+        wndsp = wdf['Wndsp'].fillna(2.0).to_numpy(dtype=float)
+        #Where RHmin is missing, compute it from Tmax and Tdew (or Tmin)
+        tmax = wdf['Tmax'].to_numpy(dtype=float)
+        tdew = wdf['Tdew'].fillna(wdf['Tmin']).to_numpy(dtype=float)
+        #ASCE (2005) Eqs. 7 and 8
+        emax = 0.6108*np.exp((17.27*tmax)/(tmax+237.3))
+        ea   = 0.6108*np.exp((17.27*tdew)/(tdew+237.3))
+        rhmin = wdf['RHmin'].to_numpy(dtype=float)
+        rhmin = np.where(np.isnan(rhmin), ea/emax*100., rhmin)
+        #Default RHmin is 45% where it cannot be computed
+        rhmin = np.where(np.isnan(rhmin), 45., rhmin)
+        #Climate adjustment to Kcmax for all days - FAO-56 Eq. 72
+        u2 = np.minimum(np.maximum(wndsp * io.u2fac, 1.0), 6.0)
+        rhmin = np.minimum(np.maximum(rhmin, 20.0), 80.)
+        wClim = (0.04*(u2-2.0)-0.004*(rhmin-45.0)).tolist()
+
+        #Rain for autoirrigation forecasts, may extend past endDate
+        fpRain = wRain
+        if self.autoirr is not None and not self.autoirr.aidata.empty:
+            fpmax = int(self.autoirr.aidata['fpday'].max())
+            fpkeys = pd.date_range(self.endDate + tdelta,
+                                   periods=max(fpmax - 1, 0))
+            fpkeys = fpkeys.strftime('%Y-%j')
+            #Only use days available before the first missing day
+            avail = fpkeys.isin(self.wth.wdata.index)
+            navail = len(avail) if avail.all() else int(avail.argmin())
+            fpRain = fpRain + list(
+                self.wth.wdata.loc[fpkeys[:navail],'Rain'])
+
+        #Autoirrigation parameter sets as records, in order
+        if self.autoirr is not None:
+            airules = list(self.autoirr.aidata.itertuples(index=False))
+            #Indices of the rules that apply on each day, i.e., those
+            #with a date range and days of the week that include it
+            dnows = dates.strftime('%w').tolist() #Day of week number
+            airdays = [[] for j in range(ndays)]
+            for i, rule in enumerate(airules):
+                aistart = datetime.datetime.strptime(rule.start,'%Y-%j')
+                aiend = datetime.datetime.strptime(rule.end,'%Y-%j')
+                first = max((aistart - self.startDate).days, 0)
+                last = min((aiend - self.startDate).days, ndays - 1)
+                for j in range(first, last + 1):
+                    if dnows[j] in rule.idow:
+                        airdays[j].append(i)
+            lastirr = None #Day of last recorded irrigation, when needed
+
+        #Day index of the last irrigation and, for each autoirrigation
+        #rule, of the last watering event of at least evnt depth (mm)
+        ilast = -1
+        if self.autoirr is not None:
+            evnts = [rule.evnt for rule in airules]
+            elast = [-1] * len(evnts)
+            #Cumulative daily sums (mm) for recent totals by rate rules
+            csum = {'Rain':[0.],'Runoff':[0.],'ETc':[0.],'ETcadj':[0.]}
+
+        for iday in range(ndays):
+            io.i = iday
+            mykey = keys[io.i]
 
             #Update ModelState object
-            io.ETref = self.wth.wdata.loc[mykey,'ETref']
+            io.ETref = wETref[io.i]
             if math.isnan(io.ETref):
                 io.ETref = self.wth.compute_etref(mykey)
-            io.rain = self.wth.wdata.loc[mykey,'Rain']
-            io.wndsp = self.wth.wdata.loc[mykey,'Wndsp']
-            if math.isnan(io.wndsp):
-                io.wndsp = 2.0
-            io.rhmin = self.wth.wdata.loc[mykey,'RHmin']
-            if math.isnan(io.rhmin):
-                tmax = self.wth.wdata.loc[mykey,'Tmax']
-                tmin = self.wth.wdata.loc[mykey,'Tmin']
-                tdew = self.wth.wdata.loc[mykey,'Tdew']
-                if math.isnan(tdew):
-                    tdew = tmin
-                #ASCE (2005) Eqs. 7 and 8
-                emax = 0.6108*math.exp((17.27*tmax)/(tmax+237.3))
-                ea   = 0.6108*math.exp((17.27*tdew)/(tdew+237.3))
-                io.rhmin = ea/emax*100.
-            if math.isnan(io.rhmin):
-                io.rhmin = 45.
+            io.rain = wRain[io.i]
+            io.clim = wClim[io.i]
             io.idep = 0.0
             io.ieff = 100.0
             if self.irr is not None:
-                if mykey in self.irr.idata.index:
-                    io.idep = self.irr.idata.loc[mykey,'Depth']
-                    io.fw = self.irr.idata.loc[mykey,'fw']
-                    io.ieff = self.irr.idata.loc[mykey,'ieff']
+                if irrday[io.i]:
+                    io.idep = irrDepth[io.i]
+                    io.fw = irrfw[io.i]
+                    io.ieff = irrieff[io.i]
 
             #Evaluate autoirrigation conditions and compute amounts
             if self.autoirr is not None:
-                for i in range(self.autoirr.aidata.shape[0]):
-                    #Evaluate date range condition
-                    aistart= self.autoirr.aidata.loc[i,'start']
-                    aistart= datetime.datetime.strptime(aistart,'%Y-%j')
-                    aiend  = self.autoirr.aidata.loc[i,'end']
-                    aiend  = datetime.datetime.strptime(aiend,'%Y-%j')
-                    if tcurrent<aistart or tcurrent>aiend:
+                #Only rules with date and day of week conditions met
+                for i in airdays[io.i]:
+                    rule = airules[i]
+                    #Evaluate management allowed depletion (mm/mm)
+                    if io.fDr <= rule.mad:
+                        continue
+                    #Evaluate management allowed depletion (mm)
+                    if io.Dr <= rule.madDr:
+                        continue
+                    #Evaluate critical Ks
+                    if io.Ks >= rule.ksc:
                         continue
                     #Evaluate "after last recorded irrigation" condition
-                    if self.autoirr.aidata.loc[i,'alre']:
+                    if rule.alre:
                         if self.irr is not None:
-                            lastirr = self.irr.getlastdate()
-                            if tcurrent <= lastirr:
+                            if lastirr is None:
+                                lastirr = self.irr.getlastdate()
+                                lastirr = (lastirr-self.startDate).days
+                            if io.i <= lastirr:
                                 continue
-                    #Evaluate day of the week condition
-                    dnow = tcurrent.strftime('%w')
-                    if dnow not in self.autoirr.aidata.loc[i,'idow']:
+                    #Evaluate days since last irrigation (dsli)
+                    if ilast >= 0:
+                        dsli = io.i - ilast
+                    else:
+                        dsli = io.i + 1
+                    if dsli < rule.dsli:
+                        continue
+                    #Evaluate days since last watering event
+                    if elast[i] >= 0:
+                        dsle = io.i - elast[i]
+                    else:
+                        dsle = io.i + 1
+                    if dsle < rule.dsle:
                         continue
                     #Evaluate forecasted precipitation condition
-                    fpdep = self.autoirr.aidata.loc[i,'fpdep']
-                    fpday = int(self.autoirr.aidata.loc[i,'fpday'])
-                    fpact = self.autoirr.aidata.loc[i,'fpact']
-                    fcrain = 0.
-                    for j in range(fpday):
-                        fpdate = tcurrent + j*tdelta
-                        fpkey = fpdate.strftime('%Y-%j')
-                        fcrain += self.wth.wdata.loc[fpkey,'Rain']
+                    fpdep = rule.fpdep
+                    fpday = int(rule.fpday)
+                    fpact = rule.fpact
+                    if io.i + fpday > len(fpRain):
+                        fpdate = self.startDate + len(fpRain)*tdelta
+                        raise KeyError(fpdate.strftime('%Y-%j'))
+                    fcrain = sum(fpRain[io.i:io.i+fpday], 0.)
                     reduceirr = 0.
                     if fcrain >= fpdep:
                         if fpact == 'cancel':
@@ -524,162 +700,150 @@ class Model:
                             reduceirr = fcrain
                         elif fpact not in ['proceed']:
                             continue
-                    #Evaluate management allowed depletion (mm/mm)
-                    if io.fDr <= self.autoirr.aidata.loc[i,'mad']:
-                        continue
-                    #Evaluate management allowed depletion (mm)
-                    if io.Dr <= self.autoirr.aidata.loc[i,'madDr']:
-                        continue
-                    #Evaluate critical Ks
-                    if io.Ks >= self.autoirr.aidata.loc[i,'ksc']:
-                        continue
-                    #Evaluate days since last irrigation (dsli)
-                    idays = self.odata[self.odata['Irrig']>0.]
-                    idays = pd.to_datetime(idays.index,format='%Y-%j')
-                    if idays.size > 0:
-                        dsli = (tcurrent-max(idays)).days
-                    else:
-                        dsli = ((tcurrent-self.startDate).days)+1
-                    if dsli < self.autoirr.aidata.loc[i,'dsli']:
-                        continue
-                    #Evaluate days since last watering event
-                    evnt = self.autoirr.aidata.loc[i,'evnt']
-                    edays = self.odata[(self.odata['Irrig']-
-                                        self.odata['IrrLoss']+
-                                        self.odata['Rain']-
-                                        self.odata['Runoff'])>=evnt]
-                    edays = pd.to_datetime(edays.index,format='%Y-%j')
-                    if edays.size > 0:
-                        dsle = (tcurrent-max(edays)).days
-                    else:
-                        dsle = ((tcurrent-self.startDate).days)+1
-                    if dsle < self.autoirr.aidata.loc[i,'dsle']:
-                        continue
 
                     #All conditions were met, need to autoirrigate
                     #Default rate is root-zone soil water depletion (Dr)
-                    rate = max([0.0,io.Dr - reduceirr])
+                    rate = max(0.0,io.Dr - reduceirr)
 
                     #Alternatively, the default rate may be modified:
                     #Use a contant rate
-                    icon  = self.autoirr.aidata.loc[i,'icon']
+                    icon  = rule.icon
                     if not math.isnan(icon):
-                        rate = max([0.0, icon - reduceirr])
+                        rate = max(0.0, icon - reduceirr)
                     #Target a specific root-zone soil water depletion
-                    itdr  = self.autoirr.aidata.loc[i,'itdr']
+                    itdr  = rule.itdr
                     if not math.isnan(itdr):
-                        rate = max([0.0,io.Dr - reduceirr - itdr])
+                        rate = max(0.0,io.Dr - reduceirr - itdr)
                     #Target a fractional root-zone soil water depletion
-                    itfdr = self.autoirr.aidata.loc[i,'itfdr']
+                    itfdr = rule.itfdr
                     if not math.isnan(itfdr):
                         itdr2 = io.TAW-io.TAW*(1.0-itfdr)
-                        rate = max([0.0,io.Dr - reduceirr - itdr2])
+                        rate = max(0.0,io.Dr - reduceirr - itdr2)
                     #Use ETcadj less precip for past X number of days
-                    ettyp = self.autoirr.aidata.loc[i,'ettyp']
-                    ietrd = self.autoirr.aidata.loc[i,'ietrd']
+                    ettyp = rule.ettyp
+                    ietrd = rule.ietrd
                     if not math.isnan(ietrd):
-                        dsss = (tcurrent-self.startDate).days
-                        recent = self.odata.tail(min([dsss,int(ietrd)]))
-                        p1 = recent['Rain'].sum()
-                        p2 = recent['Runoff'].sum()
-                        et = recent[ettyp].sum()
+                        dsss = io.i
+                        j = io.i - min(dsss,int(ietrd))
+                        p1 = csum['Rain'][io.i] - csum['Rain'][j]
+                        p2 = csum['Runoff'][io.i] - csum['Runoff'][j]
+                        et = csum[ettyp][io.i] - csum[ettyp][j]
                         etrd=(et-p1+p2)
-                        rate = max([0.0,etrd - reduceirr])
+                        rate = max(0.0,etrd - reduceirr)
                     #Use ETcadj less precip since last irrigation
-                    ettyp = self.autoirr.aidata.loc[i,'ettyp']
-                    ietri = self.autoirr.aidata.loc[i,'ietri']
+                    ettyp = rule.ettyp
+                    ietri = rule.ietri
                     if ietri:
-                        dsss = (tcurrent-self.startDate).days
-                        recent = self.odata.tail(min([dsss,dsli]))
-                        p1 = recent['Rain'].sum()
-                        p2 = recent['Runoff'].sum()
-                        et = recent[ettyp].sum()
+                        dsss = io.i
+                        j = io.i - min(dsss,dsli)
+                        p1 = csum['Rain'][io.i] - csum['Rain'][j]
+                        p2 = csum['Runoff'][io.i] - csum['Runoff'][j]
+                        et = csum[ettyp][io.i] - csum[ettyp][j]
                         etri=(et-p1+p2)
-                        rate = max([0.0,etri - reduceirr])
+                        rate = max(0.0,etri - reduceirr)
                     #Use ETcadj less precip since last watering event
-                    ettyp = self.autoirr.aidata.loc[i,'ettyp']
-                    ietre = self.autoirr.aidata.loc[i,'ietre']
+                    ettyp = rule.ettyp
+                    ietre = rule.ietre
                     if ietre:
-                        dsss = (tcurrent-self.startDate).days
-                        recent = self.odata.tail(min([dsss,dsle]))
-                        p1 = recent['Rain'].sum()
-                        p2 = recent['Runoff'].sum()
-                        et = recent[ettyp].sum()
+                        dsss = io.i
+                        j = io.i - min(dsss,dsle)
+                        p1 = csum['Rain'][io.i] - csum['Rain'][j]
+                        p2 = csum['Runoff'][io.i] - csum['Runoff'][j]
+                        et = csum[ettyp][io.i] - csum[ettyp][j]
                         etre=(et-p1+p2)
-                        rate = max([0.0,etre - reduceirr])
+                        rate = max(0.0,etre - reduceirr)
 
                     #Furthermore, adjustments to the rate can be made
                     #Adjust rate by a fixed percentage
-                    iper  = self.autoirr.aidata.loc[i,'iper']
+                    iper  = rule.iper
                     if not math.isnan(iper):
-                        rate = max([0.0, rate*iper/100.])
+                        rate = max(0.0, rate*iper/100.)
                     #Adjust rate for irrigation inefficiency
-                    ieff  = self.autoirr.aidata.loc[i,'ieff']
+                    ieff  = rule.ieff
                     if not math.isnan(ieff):
                         rate = rate/(ieff/100.)
                         io.ieff = ieff
                     #Adjust rate for minimum irrigation amount
-                    imin  = self.autoirr.aidata.loc[i,'imin']
+                    imin  = rule.imin
                     if not math.isnan(imin):
-                        rate = max([imin, rate])
+                        rate = max(imin, rate)
                     #Adjust rate for maximum irrigation amount
-                    imax  = self.autoirr.aidata.loc[i,'imax']
+                    imax  = rule.imax
                     if not math.isnan(imax):
-                        rate = min([imax,rate])
+                        rate = min(imax,rate)
 
                     #Update fraction wetted (fw) for autoirrigation
-                    io.fw=self.autoirr.aidata.loc[i,'fw']
+                    io.fw=rule.fw
 
                     #Specify the final autoirrigation rate
                     io.idep=rate
                     break
 
             #Obtain updates for Kcb, h, and fc, if available
-            io.updKcb = float('NaN')
-            io.updh = float('NaN')
-            io.updfc = float('NaN')
-            if self.upd is not None:
-                io.updKcb = self.upd.getdata(mykey,'Kcb')
-                io.updh = self.upd.getdata(mykey,'h')
-                io.updfc = self.upd.getdata(mykey,'fc')
+            io.updKcb = updKcb[io.i]
+            io.updh = updh[io.i]
+            io.updfc = updfc[io.i]
 
             #Advance timestep
             self._advance(io)
 
-            #Append results to self.odata
-            year = tcurrent.strftime('%Y')
-            doy = tcurrent.strftime('%j') #Day of Year
-            dow = tcurrent.strftime('%a') #Day of Week
-            dat = tcurrent.strftime('%m/%d/%y') #Date mm/dd/yy
-            data = [year, doy, dow, dat, io.ETref, io.tKcb, io.Kcb,
-                    io.h, io.Kcmax, io.fc, io.fw, io.few, io.De, io.Kr,
-                    io.Ke, io.E, io.DPe, io.Kc, io.ETc, io.TAW,
-                    io.TAWrmax, io.TAWb, io.Zr, io.p, io.RAW, io.Ks,
-                    io.Kcadj, io.ETcadj, io.T, io.DP, io.Dinc, io.Dr,
-                    io.fDr, io.Drmax, io.fDrmax, io.Db, io.fDb, io.idep,
-                    io.irrloss, io.rain, io.runoff, year, doy, dow, dat]
-            self.odata.loc[mykey] = data
-
-            tcurrent = tcurrent + tdelta
-            io.i+=1
+            #Store results in the output buffer
+            obuf[iday] = [io.ETref, io.tKcb, io.Kcb, io.h, io.Kcmax,
+                          io.fc, io.fw, io.few, io.De, io.Kr, io.Ke,
+                          io.E, io.DPe, io.Kc, io.ETc, io.TAW,
+                          io.TAWrmax, io.TAWb, io.Zr, io.p, io.RAW,
+                          io.Ks, io.Kcadj, io.ETcadj, io.T, io.DP,
+                          io.Dinc, io.Dr, io.fDr, io.Drmax, io.fDrmax,
+                          io.Db, io.fDb, io.idep, io.irrloss, io.rain,
+                          io.runoff]
+
+            #Update days of last irrigation and watering events
+            if io.idep > 0.:
+                ilast = io.i
+            if self.autoirr is not None:
+                water = io.idep - io.irrloss + io.rain - io.runoff
+                for j, evnt in enumerate(evnts):
+                    if water >= evnt:
+                        elast[j] = io.i
+                #Missing (NaN) values are skipped, as in pandas sums
+                for (cname, value) in (('Rain',io.rain),
+                                       ('Runoff',io.runoff),
+                                       ('ETc',io.ETc),
+                                       ('ETcadj',io.ETcadj)):
+                    if math.isnan(value):
+                        value = 0.
+                    csum[cname].append(csum[cname][-1] + value)
 
         #Save seasonal water balance data to self.swbdata dictionary
-        sdoy = self.startDate.strftime("%Y-%j")
-        edoy = self.endDate.strftime("%Y-%j")
-        self.swbdata = {'ETref'    :sum(self.odata['ETref']),
-                        'ETc'      :sum(self.odata['ETc']),
-                        'ETcadj'   :sum(self.odata['ETcadj']),
-                        'E'        :sum(self.odata['E']),
-                        'T'        :sum(self.odata['T']),
-                        'DP'       :sum(self.odata['DP']),
-                        'Irrig'    :sum(self.odata['Irrig']),
-                        'IrrLoss'  :sum(self.odata['IrrLoss']),
-                        'Rain'     :sum(self.odata['Rain']),
-                        'Runoff'   :sum(self.odata['Runoff']),
-                        'Dr_ini'   :self.odata.loc[sdoy,'Dr'],
-                        'Dr_end'   :self.odata.loc[edoy,'Dr'],
-                        'Drmax_ini':self.odata.loc[sdoy,'Drmax'],
-                        'Drmax_end':self.odata.loc[edoy,'Drmax']}
+        ob = {cname:np.ascontiguousarray(obuf[:,k])
+              for (k,cname) in enumerate(ocols)}
+        self.swbdata = {'ETref'    :ob['ETref'].sum(),
+                        'ETc'      :ob['ETc'].sum(),
+                        'ETcadj'   :ob['ETcadj'].sum(),
+                        'E'        :ob['E'].sum(),
+                        'T'        :ob['T'].sum(),
+                        'DP'       :ob['DP'].sum(),
+                        'Irrig'    :ob['Irrig'].sum(),
+                        'IrrLoss'  :ob['IrrLoss'].sum(),
+                        'Rain'     :ob['Rain'].sum(),
+                        'Runoff'   :ob['Runoff'].sum(),
+                        'Dr_ini'   :ob['Dr'][0],
+                        'Dr_end'   :ob['Dr'][-1],
+                        'Drmax_ini':ob['Drmax'][0],
+                        'Drmax_end':ob['Drmax'][-1]}
+
+        #Construct self.odata from the date strings and output buffer
+        #By default, the date columns appear at both ends as in
+        #self.cnames. Otherwise, each requested column appears once,
+        #in the order requested.
+        if outputs is None:
+            outputs = self.cnames
+        else:
+            outputs = list(dict.fromkeys(outputs))
+        dstr = {'Year':years,'DOY':doys,'DOW':dows,'Date':dats}
+        ocdata = [dstr[c] if c in dstr else ob[c] for c in outputs]
+        self.odata = pd.DataFrame(dict(enumerate(ocdata)),index=keys)
+        self.odata.columns = outputs
 
     def _advance(self, io):
         """Advance the model by one daily timestep.
@@ -690,52 +854,36 @@ class Model:
         """
 
         #Basal crop coefficient (Kcb)
-        #From FAO-56 Tables 11 and 17
-        s1 = io.Lini
-        s2 = s1 + io.Ldev
-        s3 = s2 + io.Lmid
-        s4 = s3 + io.Lend
-        if 0<=io.i<=s1:
-            io.tKcb = io.Kcbini
-            io.Kcb = io.Kcbini
-        elif s1<io.i<=s2:
-            io.tKcb += (io.Kcbmid-io.Kcbini)/(s2-s1)
-            io.Kcb += (io.Kcbmid-io.Kcbini)/(s2-s1)
-        elif s2<io.i<=s3:
-            io.tKcb = io.Kcbmid
-            io.Kcb = io.Kcbmid
-        elif s3<io.i<=s4:
-            io.tKcb += (io.Kcbmid-io.Kcbend)/(s3-s4)
-            io.Kcb += (io.Kcbmid-io.Kcbend)/(s3-s4)
-        elif s4<io.i:
-            io.tKcb = io.Kcbend
-            io.Kcb = io.Kcbend
+        #From FAO-56 Tables 11 and 17, precomputed in run()
+        tKcb = io.tKcbs[io.i]
+        if io.ramps[io.i]:
+            #Kcb follows the tKcb ramp from any previously updated value
+            io.Kcb = tKcb + (io.Kcb - io.tKcb)
+        else:
+            io.Kcb = tKcb
+        io.tKcb = tKcb
         #Overwrite Kcb if updates are available
         if io.updKcb > 0: io.Kcb = io.updKcb
 
         #Plant height (h, m)
-        io.h = max([io.hini+(io.hmax-io.hini)*(io.Kcb-io.Kcbini)/
-                    (io.Kcbmid-io.Kcbini),0.001,io.h])
+        io.h = max(io.hini+(io.hmax-io.hini)*(io.Kcb-io.Kcbini)/
+                   (io.Kcbmid-io.Kcbini),0.001,io.h)
         #Overwrite h if updates are available
         if io.updh > 0: io.h = io.updh
 
         #Root depth (Zr, m) - FAO-56 page 279
-        io.Zr = max([io.Zrini + (io.Zrmax-io.Zrini)*(io.tKcb-io.Kcbini)/
-                     (io.Kcbmid-io.Kcbini),0.001,io.Zr])
+        io.Zr = max(io.Zrini + (io.Zrmax-io.Zrini)*(io.tKcb-io.Kcbini)/
+                    (io.Kcbmid-io.Kcbini),0.001,io.Zr)
 
         #Upper limit crop coefficient (Kcmax) - FAO-56 Eq. 72
-        u2 = io.wndsp * (4.87/math.log(67.8*io.wndht-5.42))
-        u2 = sorted([1.0,u2,6.0])[1]
-        rhmin = sorted([20.0,io.rhmin,80.])[1]
         if io.rfcrp == 'S':
-            io.Kcmax = max([1.2+(0.04*(u2-2.0)-0.004*(rhmin-45.0))*
-                            (io.h/3.0)**.3, io.Kcb+0.05])
+            io.Kcmax = max(1.2+io.clim*(io.h/3.0)**.3, io.Kcb+0.05)
         elif io.rfcrp == 'T':
-            io.Kcmax = max([1.0, io.Kcb + 0.05])
+            io.Kcmax = max(1.0, io.Kcb + 0.05)
 
         #Canopy cover fraction (fc, 0.0-0.99) - FAO-56 Eq. 76
-        io.fc = sorted([0.0,((io.Kcb-io.Kcbini)/(io.Kcmax-io.Kcbini))**
-                        (1.0+0.5*io.h),0.99])[1]
+        fc = ((io.Kcb-io.Kcbini)/(io.Kcmax-io.Kcbini))**(1.0+0.5*io.h)
+        io.fc = min(max(fc, 0.0), 0.99)
         #Overwrite fc if updates are available
         if io.updfc > 0: io.fc = io.updfc
 
@@ -749,22 +897,20 @@ class Model:
         io.runoff = 0.0
         if io.roff is True:
             #Method per ASCE (2016) Eqs. 14-12 to 14-20, page 451-454
-            CN1 = io.CN2/(2.281-0.01281*io.CN2) #ASCE (2016) Eq. 14-14
-            CN3 = io.CN2/(0.427+0.00573*io.CN2) #ASCE (2016) Eq. 14-15
-            if io.De <= 0.5*io.REW:
-                CN = CN3 #ASCE (2016) Eq. 14-18
-            elif io.De >= 0.7*io.REW+0.3*io.TEW:
-                CN = CN1 #ASCE (2016) Eq. 14-19
+            if io.De <= io.DeCN3:
+                storage = io.S3 #ASCE (2016) Eq. 14-18
+            elif io.De >= io.DeCN1:
+                storage = io.S1 #ASCE (2016) Eq. 14-19
             else:
-                CN = (io.De-0.5*io.REW)*CN1
-                CN = CN+(0.7*io.REW+0.3*io.TEW-io.De)*CN3
-                CN = CN/(0.2*io.REW+0.3*io.TEW) #ASCE (2016) Eq. 14-20
-            storage = 250.*((100./CN)-1.) #ASCE (2016) Eq. 14-12
+                CN = (io.De-io.DeCN3)*io.CN1
+                CN = CN+(io.DeCN1-io.De)*io.CN3
+                CN = CN/io.DeCNrng #ASCE (2016) Eq. 14-20
+                storage = 250.*((100./CN)-1.) #ASCE (2016) Eq. 14-12
             if io.rain > 0.2*storage:
                 #ASCE (2016) Eq. 14-13
                 io.runoff = (io.rain-0.2*storage)**2
                 io.runoff = io.runoff/(io.rain+0.8*storage)
-                io.runoff = min([io.runoff,io.rain])
+                io.runoff = min(io.runoff,io.rain)
             else:
                 io.runoff = 0.0
 
@@ -782,23 +928,26 @@ class Model:
             pass #fw = previous fw
 
         #Exposed & wetted soil fraction (few, 0.01-1.0) - FAO-56 Eq. 75
-        io.few = sorted([0.01,min([1.0-io.fc, io.fw]),1.0])[1]
+        io.few = min(max(min(1.0-io.fc, io.fw), 0.01), 1.0)
 
         #Evaporation reduction coefficient (Kr, 0-1) - FAO-56 Eq. 74
-        io.Kr = sorted([0.0,(io.TEW-io.De)/(io.TEW-io.REW),1.0])[1]
+        io.Kr = min(max((io.TEW-io.De)/(io.TEW-io.REW), 0.0), 1.0)
 
         #Evaporation coefficient (Ke) - FAO-56 Eq. 71
-        io.Ke = min([io.Kr*(io.Kcmax-io.Kcb), io.few*io.Kcmax])
+        io.Ke = min(io.Kr*(io.Kcmax-io.Kcb), io.few*io.Kcmax)
 
         #Soil water evaporation (E, mm) - FAO-56 Eq. 69
         io.E = io.Ke * io.ETref
 
+        #Effective irrigation depth on the wetted fraction (mm)
+        effirrfw = effirr/io.fw
+
         #Deep percolation under exposed soil (DPe, mm) - FAO-56 Eq. 79
-        io.DPe = max([effrain + effirr/io.fw - io.De, 0.0])
+        io.DPe = max(effrain + effirrfw - io.De, 0.0)
 
         #Cumulative depth of evaporation (De, mm) - FAO-56 Eqs. 77 & 78
-        De = io.De - effrain - effirr/io.fw + io.E/io.few + io.DPe
-        io.De = sorted([0.0,De,io.TEW])[1]
+        De = io.De - effrain - effirrfw + io.E/io.few + io.DPe
+        io.De = min(max(De, 0.0), io.TEW)
 
         #Crop coefficient (Kc) - FAO-56 Eq. 69
         io.Kc = io.Ke + io.Kcb
@@ -808,18 +957,11 @@ class Model:
 
         if io.solmthd == 'D':
             # Total available water (TAW, mm) - FAO-56 Eq. 82
-            io.TAW = 1000.0 * (io.thetaFC - io.thetaWP) * io.Zr
+            io.TAW = io.TAWpm * io.Zr
         elif io.solmthd == 'L':
-            io.TAW = 0.
-            #Iterate down the soil profile in 1 mm increments
-            for dpthmm in list(range(1, (io.lyr_dpths[-1] * 10 + 1))):
-                #Find soil layer index that contains dpthmm
-                lyr_idx = [idx for (idx, dpth) in
-                          enumerate(io.lyr_dpths) if dpthmm<=dpth*10][0]
-                #Total available water (TAW, mm)
-                if dpthmm <= io.Zr * 1000.: #mm
-                    diff = (io.lyr_thFC[lyr_idx] - io.lyr_thWP[lyr_idx])
-                    io.TAW += diff #mm
+            #Total available water (TAW, mm) to the nearest mm of Zr
+            mmZr = min(io.lyr_mm, math.floor(io.Zr * 1000.))
+            io.TAW = io.lyr_cTAW[mmZr]
             #Total available water in the bottom layer (TAWb, mm)
             io.TAWb_prev = io.TAWb
             io.TAWb = io.TAWrmax - io.TAW
@@ -828,7 +970,7 @@ class Model:
         if io.cons_p is True:
             io.p = io.pbase
         else:
-            io.p = sorted([0.1,io.pbase+0.04*(5.0-io.ETc),0.8])[1]
+            io.p = min(max(io.pbase+0.04*(5.0-io.ETc), 0.1), 0.8)
 
         #Readily available water (RAW, mm) - FAO-56 Equation 83
         io.RAW = io.p * io.TAW
@@ -837,13 +979,16 @@ class Model:
         if io.aq_Ks is True:
             #Ks method from AquaCrop
             rSWD = io.Dr/io.TAW
-            Drel = (rSWD-io.p)/(1.0-io.p)
-            sf = 1.5
-            aqKs = 1.0-(math.exp(sf*Drel)-1.0)/(math.exp(sf)-1.0)
-            io.Ks = sorted([0.0, aqKs, 1.0])[1]
+            if rSWD <= io.p:
+                #No water stress until depletion exceeds p
+                io.Ks = 1.0
+            else:
+                Drel = (rSWD-io.p)/(1.0-io.p)
+                aqKs = 1.0-(math.exp(io.sf*Drel)-1.0)/io.sfexp
+                io.Ks = min(max(aqKs, 0.0), 1.0)
         else:
             #FAO-56 Eq. 84
-            io.Ks = sorted([0.0,(io.TAW-io.Dr)/(io.TAW-io.RAW),1.0])[1]
+            io.Ks = min(max((io.TAW-io.Dr)/(io.TAW-io.RAW), 0.0), 1.0)
 
         #Adjusted crop coefficient (Kcadj) - FAO-56 Eq. 80
         io.Kcadj = io.Ks * io.Kcb + io.Ke
@@ -859,14 +1004,11 @@ class Model:
             #Deep percolation (DP, mm) - FAO-56 Eq. 88
             #Boundary layer is considered at the root zone depth (Zr)
             DP = effrain + effirr - io.ETcadj - io.Dr
-            io.DP = max([DP,0.0])
+            io.DP = max(DP,0.0)
 
             #Root zone soil water depletion (Dr,mm) - FAO-56 Eqs.85 & 86
             Dr = io.Dr - effrain - effirr + io.ETcadj + io.DP
-            io.Dr = sorted([0.0, Dr, io.TAW])[1]
-
-            #Root zone soil water depletion fraction (fDr, mm/mm)
-            io.fDr = 1.0 - ((io.TAW - io.Dr) / io.TAW)
+            io.Dr = min(max(Dr, 0.0), io.TAW)
 
             #By default, FAO-56 doesn't consider the following variables
             io.Dinc = -99.999
@@ -879,7 +1021,7 @@ class Model:
             #Deep percolation (DP, mm)
             #Boundary layer is at the max root depth (Zrmax)
             DP = effrain + effirr - io.ETcadj - io.Drmax
-            io.DP = max([DP,0.0])
+            io.DP = max(DP,0.0)
 
             #Depletion increment due to root growth (Dinc, mm)
             #Computed from Db based on the incremental change in TAWb
@@ -890,24 +1032,26 @@ class Model:
 
             #Root zone soil water depletion (Dr, mm)
             Dr = io.Dr - effrain - effirr + io.ETcadj + io.Dinc
-            io.Dr = sorted([0.0, Dr, io.TAW])[1]
-
-            #Root zone soil water depletion fraction (fDr, mm/mm)
-            io.fDr = 1.0 - ((io.TAW - io.Dr) / io.TAW)
+            io.Dr = min(max(Dr, 0.0), io.TAW)
 
             #Soil water depletion at max root depth (Drmax, mm)
             Drmax = io.Drmax - effrain - effirr + io.ETcadj + io.DP
-            io.Drmax = sorted([0.0, Drmax, io.TAWrmax])[1]
+            io.Drmax = min(max(Drmax, 0.0), io.TAWrmax)
 
             #Soil water depletion fraction at Zrmax (fDrmax, mm/mm)
             io.fDrmax = 1.0 - ((io.TAWrmax - io.Drmax) / io.TAWrmax)
 
             #Soil water depletion in the bottom layer (Db, mm)
             Db = io.Drmax - io.Dr
-            io.Db = sorted([0.0, Db, io.TAWb])[1]
+            #Keep the middle of 0.0, Db, and TAWb, where TAWb < 0.0 if
+            #Zr exceeds Zrmax
+            io.Db = min(max(Db, min(0.0, io.TAWb)), max(0.0, io.TAWb))
 
             #Bottom layer soil water depletion fraction (fDb, mm/mm)
             if io.TAWb > 0.0:
                 io.fDb = 1.0 - ((io.TAWb - io.Db) / io.TAWb)
             else:
                 io.fDb = 0.0
+
+        #Root zone soil water depletion fraction (fDr, mm/mm)
+        io.fDr = 1.0 - ((io.TAW - io.Dr) / io.TAW)
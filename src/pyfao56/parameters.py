@@ -70,6 +70,10 @@ class Parameters:
         Load the parameter data from a file
     """
 
+    __slots__ = ('Kcbini','Kcbmid','Kcbend','Lini','Ldev','Lmid','Lend',
+                 'hini','hmax','thetaFC','thetaWP','theta0','Zrini',
+                 'Zrmax','pbase','Ze','REW','CN2','comment','tmstmp')
+
     def __init__(self, Kcbini=0.15, Kcbmid=1.10, Kcbend=0.50, Lini=25,
                  Ldev=50, Lmid=50, Lend=25, hini=0.010, hmax=1.20,
                  thetaFC=0.250, thetaWP=0.100, theta0=0.100, Zrini=0.20,
@@ -206,6 +210,8 @@ class Parameters:
         ------
         FileNotFoundError
             If filepath is not found.
+        ValueError
+            If the file has no line of asterisks before the parameters.
         """
 
         try:
@@ -213,54 +219,48 @@ class Parameters:
         except FileNotFoundError:
             print('The filepath for parameter data is not found.')
         else:
-            lines = f.readlines()
+            lines = f.read().splitlines()
             f.close()
             ast = '*' * 72
-            a = [i for i,line in enumerate(lines) if line.strip()==ast]
-            endast = a[-1] 
+            #Search back from the end for the last line of asterisks
+            for endast in range(len(lines)-1, -1, -1):
+                if lines[endast].strip() == ast:
+                    break
+            else:
+                raise ValueError('No line of asterisks found in the '
+                                 'parameter file: ' + str(filepath))
             if endast == 3: #v1.1.0 and prior - no timestamps & metadata
                 self.comment = 'Comments: '
             else:
-                self.comment = ''.join(lines[5:endast]).strip()
+                self.comment = '\n'.join(lines[5:endast]).strip()
             if endast >= 4:
                 ts = lines[3].strip().split('stamp:')[1].strip()
                 ts = datetime.datetime.strptime(ts,'%m/%d/%Y %H:%M:%S')
                 self.tmstmp = ts
+            #Parameter names in lower case with their attribute and type
+            pnames = {'kcbini':('Kcbini',float),
+                      'kcbmid':('Kcbmid',float),
+                      'kcbend':('Kcbend',float),
+                      'lini':('Lini',int),
+                      'ldev':('Ldev',int),
+                      'lmid':('Lmid',int),
+                      'lend':('Lend',int),
+                      'hini':('hini',float),
+                      'hmax':('hmax',float),
+                      'thetafc':('thetaFC',float),
+                      'thetawp':('thetaWP',float),
+                      'theta0':('theta0',float),
+                      'zrini':('Zrini',float),
+                      'zrmax':('Zrmax',float),
+                      'pbase':('pbase',float),
+                      'ze':('Ze',float),
+                      'rew':('REW',float),
+                      'cn2':('CN2',int)}
             for line in lines[endast+1:]:
-                line = line.strip().split(',')[0].split()
-                if line[1].lower() == 'kcbini':
-                    self.Kcbini = float(line[0])
-                elif line[1].lower() == 'kcbmid':
-                    self.Kcbmid = float(line[0])
-                elif line[1].lower() == 'kcbend':
-                    self.Kcbend = float(line[0])
-                elif line[1].lower() == 'lini':
-                    self.Lini = int(line[0])
-                elif line[1].lower() == 'ldev':
-                    self.Ldev = int(line[0])
-                elif line[1].lower() == 'lmid':
-                    self.Lmid = int(line[0])
-                elif line[1].lower() == 'lend':
-                    self.Lend = int(line[0])
-                elif line[1].lower() == 'hini':
-                    self.hini = float(line[0])
-                elif line[1].lower() == 'hmax':
-                    self.hmax = float(line[0])
-                elif line[1].lower() == 'thetafc':
-                    self.thetaFC = float(line[0])
-                elif line[1].lower() == 'thetawp':
-                    self.thetaWP = float(line[0])
-                elif line[1].lower() == 'theta0':
-                    self.theta0 = float(line[0])
-                elif line[1].lower() == 'zrini':
-                    self.Zrini = float(line[0])
-                elif line[1].lower() == 'zrmax':
-                    self.Zrmax = float(line[0])
-                elif line[1].lower() == 'pbase':
-                    self.pbase = float(line[0])
-                elif line[1].lower() == 'ze':
-                    self.Ze = float(line[0])
-                elif line[1].lower() == 'rew':
-                    self.REW = float(line[0])
-                elif line[1].lower() == 'CN2':
-                    self.CN2 = int(line[0])
+                #Value and name precede the first comma
+                line = line.partition(',')[0].split()
+                if len(line) < 2:
+                    continue
+                pname = pnames.get(line[1].lower())
+                if pname is not None:
+                    setattr(self, pname[0], pname[1](line[0]))
@@ -137,8 +137,8 @@ def ascedaily(rfcrp,z,lat,doy,israd,tmax,tmin,
 
     #rnl (float) : Net longwave radiation (MJ m^-2 d^-1)
     #ASCE (2005) Eqs. 17 and 18
-    ratio = sorted([0.3,israd/rso,1.0])[1]
-    fcd = sorted([0.05,1.35*ratio-0.35,1.0])[1] #Eq. 18
+    ratio = min(max(israd/rso,0.3),1.0)
+    fcd = min(max(1.35*ratio-0.35,0.05),1.0) #Eq. 18
     tk4 = ((tmax+273.16)**4.0+(tmin+273.16)**4.0)/2.0 #Eq. 17
     rnl = 4.901e-9*fcd*(0.34-0.14*math.sqrt(ea))*tk4 #Eq. 17
 
@@ -314,8 +314,8 @@ def ascehourly(rfcrp,z,lat,lon,lzn,doy,sct,israd,tavg,vapr=float('NaN'),
     if beta < 0.3 or rso <= 0.0: #nighttime
         fcd = fcdpt
     else: #daytime
-        ratio = sorted([0.3,israd/rso,1.0])[1] #Eq. 45
-        fcd = sorted([0.05,1.35*ratio-0.35,1.0])[1] #Eq. 45
+        ratio = min(max(israd/rso,0.3),1.0) #Eq. 45
+        fcd = min(max(1.35*ratio-0.35,0.05),1.0) #Eq. 45
     tk4 = (tavg+273.16)**4.0 #Eq. 44
     rnl = 2.042e-10*fcd*(0.34-0.14*math.sqrt(ea))*tk4 #Eq. 44
 
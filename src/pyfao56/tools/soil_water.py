@@ -445,4 +445,4 @@ class SoilWaterSeries:
             TAW = mdl.odata.loc[self.mdate,'TAW']
             RAW = mdl.odata.loc[self.mdate,'RAW']
             Ks = (TAW - self.mDr) / (TAW - RAW) #FAO-56 Eq. 84
-            self.mKs = sorted([0.0,Ks,1.0])[1]
+            self.mKs = min(max(Ks,0.0),1.0)
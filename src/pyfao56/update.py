@@ -44,6 +44,8 @@ class Update:
         Users can override for custom loading of update data
     getdata(index,var)
         Return a value from self.udata for model updating
+    getseries(index,var)
+        Return values from self.udata for a sequence of indices
     """
 
     def __init__(self,filepath=None,comment=''):
@@ -169,3 +171,27 @@ class Update:
             return self.udata.loc[index,var]
         except:
             return float('NaN')
+
+    def getseries(self, index, var):
+        """Obtain update values for a variable over many indices.
+
+        Parameters
+        ----------
+        index : list
+            A list of year-doy strings (yyyy-ddd) as indices to
+            self.udata
+        var : str
+            A column variable to return ('Kcb','h','fc')
+
+        Returns
+        -------
+        values : list
+            Update values as float, NaN where no update is available
+        """
+
+        try:
+            values = self.udata[var]
+        except KeyError:
+            #No updates are provided for var
+            return [float('NaN')] * len(index)
+        return values.reindex(index).astype(float).tolist()